@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: GraphQL request encode / response decode per SO, offline.
+
+Compares the old path (json.dumps of {query, variables} with the description
+re-encoded for every issue, and r.json() via str → json.loads) against linear_core:
+a pre-minified/pre-encoded Document, descriptions spliced in as pre-encoded
+RawJSON fragments, and the pluggable codec (orjson when installed).
+
+  python bench_codec.py [--issues 28] [--desc-kb 4] [--repeat 200]
+"""
+import argparse
+import json
+import random
+import timeit
+
+import linear_core
+from linear_core import Document, OrjsonCodec, RawJSON, StdlibCodec, encode_body
+
+ISSUE_CREATE = """
+    mutation($input: IssueCreateInput!) {
+      issueCreate(input: $input) {
+        success
+        issue { id title dueDate }
+      }
+    }"""
+
+def _markdown(kb: int, rnd: random.Random) -> str:
+    words = ["BOM", "drawing", "spec", "enclosure", "wiring", "QC", "sign-off", "panel", "→", "°C", "±5%"]
+    lines = ["## Checklist", ""]
+    while sum(len(l) for l in lines) < kb * 1024:
+        lines.append("- [ ] " + " ".join(rnd.choice(words) for _ in range(12)))
+    return "\n".join(lines)
+
+def _issue_nodes(n: int, kb: int, rnd: random.Random) -> list:
+    return [
+        {"title": f"[Dept] Template issue {i}", "description": _markdown(kb, rnd),
+         "labels": {"nodes": [{"name": "Sales"}, {"name": "Phase"}]}}
+        for i in range(n)
+    ]
+
+def _bench(fn, repeat: int) -> float:
+    """Best-of-5 microseconds per call."""
+    return min(timeit.repeat(fn, number=repeat, repeat=5)) / repeat * 1e6
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--issues", type=int, default=28, help="template issues created per SO")
+    ap.add_argument("--desc-kb", type=int, default=4, help="description size")
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    nodes = _issue_nodes(args.issues, args.desc_kb, rnd)
+    inputs = [
+        {"title": n["title"], "projectId": "p-uuid", "teamId": "t-uuid", "assigneeId": "a-uuid",
+         "priority": 0, "labelIds": ["l1", "l2"], "dueDate": "2026-11-20"}
+        for n in nodes
+    ]
+    page = json.dumps({"data": {"project": {"issues": {
+        "nodes": nodes, "pageInfo": {"hasNextPage": False, "endCursor": None}}}}}).encode("utf-8")
+    create_resp = [json.dumps({"data": {"issueCreate": {"success": True, "issue": {
+        "id": f"i-{i}", "title": n["title"], "dueDate": "2026-11-20"}}}}).encode("utf-8") for i, n in enumerate(nodes)]
+
+    def old_encode():
+        for inp, n in zip(inputs, nodes):
+            json.dumps({"query": ISSUE_CREATE, "variables": {"input": dict(inp, description=n["description"])}})
+
+    def old_decode():
+        json.loads(page.decode("utf-8"))
+        for r in create_resp:
+            json.loads(r.decode("utf-8"))
+
+    print(f"per SO: {args.issues} issueCreate bodies ({args.desc_kb} KB descriptions) + 1 issue page "
+          f"({len(page) // 1024} KB) and {args.issues} create responses decoded")
+    old_enc, old_dec = _bench(old_encode, args.repeat), _bench(old_decode, args.repeat)
+    print(f"  {'stdlib, re-encoded (old)':<34} encode {old_enc:9.1f} µs   decode {old_dec:9.1f} µs")
+
+    codecs = [StdlibCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:
+        print("  (orjson not installed; stdlib codec only)")
+
+    for c in codecs:
+        linear_core.set_codec(c)
+        doc = Document(ISSUE_CREATE)
+        descs = [RawJSON(c.dumps(n["description"])) for n in nodes]  # once per run, not per SO
+
+        def new_encode():
+            for inp, d in zip(inputs, descs):
+                encode_body(doc, {"input": dict(inp, description=d)})
+
+        def new_decode():
+            c.loads(page)
+            for r in create_resp:
+                c.loads(r)
+
+        enc, dec = _bench(new_encode, args.repeat), _bench(new_decode, args.repeat)
+        print(f"  {'pre-encoded + ' + c.name:<34} encode {enc:9.1f} µs   decode {dec:9.1f} µs"
+              f"   saves {old_enc - enc:8.1f} / {old_dec - dec:8.1f} µs per SO "
+              f"({old_enc / enc:.1f}x / {old_dec / dec:.1f}x)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for cli.py.
+
+For each invocation, spawns a fresh interpreter that imports cli, parses the arguments
+and imports the command's module (everything up to the command doing work), and checks:
+  - it stays under that command's STARTUP_BUDGET_MS entry (median of RUNS, bare
+    interpreter start excluded). Commands backed by main.py pay ~100 ms for numpy,
+    which planning needs; teardown should not.
+  - none of the command's HEAVY_MODULES were imported on the way (network/env
+    libraries load on first API call, not at startup)
+
+  python bench_startup.py          # exit 1 if over budget
+"""
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RUNS = 7
+STARTUP_BUDGET_MS = {
+    "plan": 250.0,
+    "provision": 250.0,
+    "teardown": 40.0,
+}
+_LAZY = ("requests", "dotenv")
+HEAVY_MODULES = {
+    "plan": _LAZY,
+    "provision": _LAZY,
+    "teardown": _LAZY + ("numpy", "main"),
+}
+
+INVOCATIONS = [
+    ["plan", "--so", "SO109616"],
+    ["teardown", "--so", "SO109616", "--dry-run"],
+    ["provision", "--so", "SO109616", "--dry-run"],
+]
+
+HERE = Path(__file__).resolve().parent
+
+_PROBE = """
+import sys, time
+t = time.perf_counter()
+import cli
+args = cli.build_parser().parse_args({argv!r})
+cli.load_command_module(args.command)
+ms = (time.perf_counter() - t) * 1000
+print(ms, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def _run(code: str) -> str:
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True)
+    return out.stdout.strip()
+
+def main() -> int:
+    ok = True
+    print(f"median of {RUNS}, python {sys.version.split()[0]}")
+    for argv in INVOCATIONS:
+        command = argv[0]
+        budget = STARTUP_BUDGET_MS[command]
+        times, loaded = [], ""
+        for _ in range(RUNS):
+            ms, _, loaded = _run(_PROBE.format(argv=argv, heavy=HEAVY_MODULES[command])).partition(" ")
+            times.append(float(ms))
+        med = statistics.median(times)
+        status = "ok"
+        if med > budget:
+            status, ok = "OVER BUDGET", False
+        if loaded:
+            status, ok = f"HEAVY IMPORTS: {loaded}", False
+        print(f"  {' '.join(argv):<40} {med:7.2f} ms / {budget:.0f} ms  {status}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
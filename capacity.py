@@ -0,0 +1,153 @@
+"""
+Capacity-aware SO placement.
+
+Department load is a per-working-day count of open tasks, one dense array per
+assignee group indexed by working-day ordinal from an origin date. Intervals are
+added with a difference array, and each new SO goes to the earliest start where
+every one of its tasks fits under its department's capacity. Fit is checked for all
+candidate starts at once with sliding-window maxima.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scheduling import DateLike, WorkCalendar, to_day
+
+# (group, start_offset, end_offset) in working days relative to the SO start, end exclusive
+Task = Tuple[str, int, int]
+
+def so_tasks_from_schedule(seq: Sequence[Tuple[str, int, str]]) -> List[Task]:
+    """
+    [(title, days, group), ...] in schedule order → the SO's task intervals.
+    Task k occupies [cum_k - days_k, cum_k), matching due = start + cum_k working days.
+    """
+    tasks: List[Task] = []
+    total = 0
+    for _title, days, group in seq:
+        if days > 0 and group:
+            tasks.append((group, total, total + days))
+        total += days
+    return tasks
+
+class LoadTimeline:
+    """Open-task count per group per working day, from `origin` onwards."""
+
+    def __init__(self, calendar: WorkCalendar, origin: DateLike, horizon_days: int = 512):
+        self.calendar = calendar
+        self.origin = calendar.roll_forward(to_day(origin))
+        self.horizon = horizon_days
+        self._load: Dict[str, np.ndarray] = {}
+        self._end = 0  # last busy ordinal + 1, across groups
+
+    # ----- date <-> working-day ordinal -----
+
+    def ordinal(self, dates) -> np.ndarray:
+        """Working days from origin (negative for dates before it)."""
+        return self.calendar.count_workdays(self.origin, self.calendar.roll_forward(dates))
+
+    def date_of(self, ordinals) -> np.ndarray:
+        return self.calendar.add_workdays(self.origin, ordinals)
+
+    # ----- building -----
+
+    def _grow(self, n: int):
+        if n <= self.horizon:
+            return
+        while self.horizon < n:
+            self.horizon *= 2
+        for g, arr in self._load.items():
+            self._load[g] = np.concatenate((arr, np.zeros(self.horizon - arr.size, dtype=arr.dtype)))
+
+    def _array(self, group: str) -> np.ndarray:
+        arr = self._load.get(group)
+        if arr is None:
+            arr = self._load[group] = np.zeros(self.horizon, dtype=np.int32)
+        return arr
+
+    def add_intervals(self, groups: Sequence[str], starts, ends):
+        """Add one unit of load on [start, end) for each interval. Vectorized per group."""
+        starts = np.maximum(np.asarray(starts, dtype=np.int64), 0)
+        ends = np.asarray(ends, dtype=np.int64)
+        keep = ends > starts
+        if not keep.any():
+            return
+        groups = np.asarray(groups, dtype=object)[keep]
+        starts, ends = starts[keep], ends[keep]
+        self._end = max(self._end, int(ends.max()))
+        self._grow(self._end + 1)
+        for g in set(groups):
+            m = groups == g
+            diff = np.zeros(self.horizon + 1, dtype=np.int32)
+            np.add.at(diff, starts[m], 1)
+            np.add.at(diff, ends[m], -1)
+            arr = self._array(g)
+            arr += np.cumsum(diff[:-1], dtype=np.int32)
+
+    def add_open_issues(self, issues: Iterable[Tuple[str, DateLike, int]]):
+        """
+        Existing work: [(group, due_date, duration_days), ...]; each issue occupies the
+        `duration_days` working days before its due date, like the SO's own tasks.
+        Overdue issues are still open, so their full duration is booked from the origin.
+        """
+        rows = list(issues)
+        if not rows:
+            return
+        groups = [g for g, _, _ in rows]
+        due = self.ordinal(np.array([to_day(d) for _, d, _ in rows], dtype="datetime64[D]"))
+        dur = np.maximum(np.array([d for _, _, d in rows], dtype=np.int64), 1)
+        ends = np.maximum(due, dur)
+        self.add_intervals(groups, ends - dur, ends)
+
+    def place(self, tasks: Sequence[Task], start: int):
+        self.add_intervals([g for g, _, _ in tasks], [start + a for _, a, _ in tasks], [start + b for _, _, b in tasks])
+
+    # ----- querying -----
+
+    def load(self, group: str, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        arr = self._load.get(group)
+        end = self.horizon if end is None else end
+        if arr is None:
+            return np.zeros(max(end - start, 0), dtype=np.int32)
+        return arr[start:end]
+
+    def earliest_fit(self, tasks: Sequence[Task], capacity: Dict[str, int], default_capacity: int,
+                     not_before: int = 0) -> int:
+        """Smallest start >= not_before where each task's group stays <= capacity on every day it spans."""
+        if not tasks:
+            return not_before
+        span = max(b for _, _, b in tasks)
+        # past the last busy day everything fits, so this many candidates always contains an answer
+        n_cand = max(self._end, not_before) - not_before + 1
+        self._grow(not_before + n_cand + span)
+
+        ok = np.ones(n_cand, dtype=bool)
+        for g, a, b in tasks:
+            cap = capacity.get(g, default_capacity)
+            if cap < 1:
+                raise ValueError(f"Capacity for '{g}' must be >= 1, got {cap}")
+            arr = self._load.get(g)
+            if arr is None:
+                continue
+            lo = not_before + a
+            window = sliding_window_view(arr[lo:lo + n_cand + (b - a) - 1], b - a)
+            ok &= window.max(axis=1) < cap
+        return not_before + int(np.argmax(ok))
+
+def schedule_sales_orders(
+    sales_orders: Sequence[str],
+    timeline: LoadTimeline,
+    tasks: Sequence[Task],
+    capacity: Dict[str, int],
+    default_capacity: int,
+) -> List[np.datetime64]:
+    """
+    Greedy placement in list order: each SO gets the earliest start that fits,
+    then its tasks are booked so later SOs see the load. Returns one start date per SO.
+    """
+    starts = []
+    for _so in sales_orders:
+        s = timeline.earliest_fit(tasks, capacity, default_capacity)
+        timeline.place(tasks, s)
+        starts.append(s)
+    return list(timeline.date_of(np.array(starts, dtype=np.int64)))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Linear SO automation.
+
+  python cli.py provision  --so SO109616 [--dry-run]   create SO projects from the templates
+  python cli.py plan       --so SO109616 [--issues]    print project windows / due dates (offline)
+  python cli.py teardown   --so SO109616 [--dry-run]   delete (or archive) an SO's projects
+  python cli.py reschedule --so SO109616 [--dry-run]   move existing projects/issues to a new plan
+  python cli.py sync       --so SO109616 [--dry-run]   fill in missing issues/links on existing projects
+
+Only stdlib is imported here; each command imports its own module when it runs.
+teardown (delete.py) starts in milliseconds. The planning commands import main.py,
+which needs numpy (~100 ms of their startup). bench_startup.py checks both budgets.
+"""
+import argparse
+import importlib
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+_T0 = time.perf_counter()
+
+def startup_ms() -> float:
+    """Milliseconds from this module's import to now."""
+    return (time.perf_counter() - _T0) * 1000.0
+
+def _date(s: str) -> datetime:
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {s!r}")
+
+def _stagger(args) -> Optional[bool]:
+    """--capacity / --fixed-stagger → True / False; neither → config default (None)."""
+    return getattr(args, "capacity", None)
+
+# ---------------- Commands ----------------
+
+# module each command imports before doing any work (bench_startup.py times this too)
+COMMAND_MODULES = {
+    "provision": "main",
+    "plan": "main",
+    "teardown": "delete",
+    "reschedule": "main",
+    "sync": "main",
+}
+
+def load_command_module(command: str):
+    return importlib.import_module(COMMAND_MODULES[command])
+
+def _cmd_provision(args) -> int:
+    provisioning = load_command_module(args.command)
+    return provisioning.main(args.so, dry_run=args.dry_run, base_date=args.base_date,
+                             capacity_aware=_stagger(args))
+
+def _cmd_sync(args) -> int:
+    provisioning = load_command_module(args.command)
+    return provisioning.main(args.so, dry_run=args.dry_run, base_date=args.base_date,
+                             capacity_aware=_stagger(args), create_projects=False)
+
+def _cmd_reschedule(args) -> int:
+    provisioning = load_command_module(args.command)
+    return provisioning.reschedule(args.so, dry_run=args.dry_run, base_date=args.base_date,
+                                   capacity_aware=_stagger(args))
+
+def _cmd_plan(args) -> int:
+    provisioning = load_command_module(args.command)
+    sales_orders = args.so or provisioning.SALES_ORDERS
+    if args.capacity:
+        provisioning.require_env()
+    plan = provisioning.build_plan(sales_orders, args.base_date, capacity_aware=bool(args.capacity))
+    provisioning.show_plan(plan, show_issues=args.issues)
+    return 0
+
+def _cmd_teardown(args) -> int:
+    delete = load_command_module(args.command)
+    return delete.main(args.so, dry_run=args.dry_run)
+
+# ---------------- Parser ----------------
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="cli.py", description="Linear SO automation")
+    p.add_argument("--timings", action="store_true", help="print startup and total time to stderr")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def so_arg(sp, required: bool = False):
+        sp.add_argument("--so", nargs="+", metavar="SO", required=required,
+                        help="sales orders" + ("" if required else " (default: SALES_ORDERS in main.py)"))
+
+    def dry_run_arg(sp):
+        sp.add_argument("--dry-run", action="store_true", default=None, help="print what would change, write nothing")
+
+    def schedule_args(sp, default_capacity: bool = True):
+        sp.add_argument("--base-date", type=_date, metavar="YYYY-MM-DD", help="start of the first SO (default: today)")
+        g = sp.add_mutually_exclusive_group()
+        g.add_argument("--capacity", dest="capacity", action="store_true", default=None,
+                       help="place SOs by department load" + (" (default: CAPACITY_AWARE_STAGGER)" if default_capacity else " (reads Linear)"))
+        g.add_argument("--fixed-stagger", dest="capacity", action="store_false",
+                       help="offset SOs by SO_STAGGER_MONTHS")
+
+    sp = sub.add_parser("provision", help="create SO projects, issues, relations and links from templates")
+    so_arg(sp); dry_run_arg(sp); schedule_args(sp)
+    sp.set_defaults(func=_cmd_provision)
+
+    sp = sub.add_parser("plan", help="print the schedule without touching Linear")
+    so_arg(sp); schedule_args(sp, default_capacity=False)
+    sp.add_argument("--issues", action="store_true", help="include every issue due date")
+    sp.set_defaults(func=_cmd_plan)
+
+    sp = sub.add_parser("teardown", help="delete (or archive) all phase projects of the given SOs")
+    so_arg(sp, required=True); dry_run_arg(sp)
+    sp.set_defaults(func=_cmd_teardown)
+
+    sp = sub.add_parser("reschedule", help="move existing project windows and issue due dates to a new plan")
+    so_arg(sp); dry_run_arg(sp); schedule_args(sp)
+    sp.set_defaults(func=_cmd_reschedule)
+
+    sp = sub.add_parser("sync", help="add missing template issues, relations and links to existing SO projects")
+    so_arg(sp); dry_run_arg(sp); schedule_args(sp)
+    sp.set_defaults(func=_cmd_sync)
+
+    return p
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.timings:
+        print(f"[TIME] startup {startup_ms():.1f} ms", file=sys.stderr)
+    rc = args.func(args)
+    if args.timings:
+        print(f"[TIME] total {startup_ms():.1f} ms", file=sys.stderr)
+    return rc or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
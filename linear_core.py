@@ -0,0 +1,422 @@
+"""
+Shared core for the Linear automation scripts: environment, the GraphQL client
+(with its read-through query cache) and lookups every command needs.
+
+Importing this module does no I/O; .env is read and `requests` is imported on first use.
+"""
+import os, sys, json, time, re, threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple, Union
+
+LINEAR_API_URL = "https://api.linear.app/graphql"
+
+# ---------------- Environment ----------------
+
+_env_loaded = False
+
+def load_env():
+    """Read .env once (LINEAR_API_KEY, LINEAR_TEAM_ID)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv, find_dotenv
+        load_dotenv(find_dotenv())
+        _env_loaded = True
+
+def api_key() -> Optional[str]:
+    load_env()
+    return os.getenv("LINEAR_API_KEY")   # raw key; no "Bearer "
+
+def team_id() -> Optional[str]:
+    load_env()
+    return os.getenv("LINEAR_TEAM_ID")
+
+def require_env(need_team: bool = True):
+    if not api_key():
+        die("LINEAR_API_KEY not set")
+    if need_team and not team_id():
+        die("LINEAR_TEAM_ID not set")
+
+# ---------------- GraphQL helpers ----------------
+
+def die(msg: str):
+    print(f"[FATAL] {msg}", file=sys.stderr); sys.exit(1)
+
+# ---------------- JSON codec ----------------
+# orjson when installed, stdlib json otherwise. Both encode to / decode from UTF-8 bytes,
+# and either can be swapped in with set_codec().
+
+class StdlibCodec:
+    name = "json"
+
+    def __init__(self):
+        # json.dumps builds a new encoder per call whenever options are passed
+        self._encoders = {
+            sort_keys: json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+            for sort_keys in (False, True)
+        }
+
+    def dumps(self, obj, sort_keys: bool = False) -> bytes:
+        return self._encoders[sort_keys].encode(obj).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]):
+        # json.loads(bytes) sniffs the encoding before decoding; skip that, responses are UTF-8
+        return json.loads(data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else data)
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj, sort_keys: bool = False) -> bytes:
+        return self._orjson.dumps(obj, option=self._orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    def loads(self, data: Union[bytes, str]):
+        return self._orjson.loads(data)
+
+def _default_codec():
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibCodec()
+
+codec = _default_codec()
+
+def set_codec(new_codec):
+    """Use a different codec (anything with dumps(obj, sort_keys=False) -> bytes and loads(bytes))."""
+    global codec
+    codec = new_codec
+
+# ---------------- Documents / request bodies ----------------
+
+class RawJSON:
+    """An already JSON-encoded value; spliced into the request body verbatim instead of re-encoded."""
+    __slots__ = ("encoded",)
+
+    def __init__(self, encoded: Union[bytes, str]):
+        self.encoded = encoded.encode("utf-8") if isinstance(encoded, str) else encoded
+
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+_STRING_OR_COMMENT_RE = re.compile(r'"(?:[^"\\]|\\.)*"|#[^\n]*')
+_PUNCT_RE = re.compile(r"\s*([{}()\[\]:,!$=@])\s*")
+
+def minify_query(query: str) -> str:
+    """Drop comments and insignificant whitespace from a GraphQL document, leaving string literals alone."""
+    # a comment runs to end of line unless it is inside a string; it still separates tokens
+    query = _STRING_OR_COMMENT_RE.sub(lambda m: m.group(0) if m.group(0)[0] == '"' else " ", query)
+    out, pos = [], 0
+    for m in _STRING_RE.finditer(query):
+        out.append(_PUNCT_RE.sub(r"\1", re.sub(r"\s+", " ", query[pos:m.start()])))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(_PUNCT_RE.sub(r"\1", re.sub(r"\s+", " ", query[pos:])))
+    return "".join(out).strip()
+
+class Document:
+    """A GraphQL document, minified and JSON-encoded once, plus its operation type and root field."""
+    __slots__ = ("text", "encoded", "op", "root")
+
+    def __init__(self, query: str):
+        self.text = minify_query(query)
+        self.op, self.root = _operation_and_root(self.text)
+        self.encoded = codec.dumps(self.text)
+
+DOCUMENT_MEMO_MAX = 512
+_documents: Dict[str, Document] = {}
+
+def document(query: Union[str, Document]) -> Document:
+    """
+    Document for a query string. Memoized on the literal, so the static documents in this
+    repo are minified/encoded once per process; generated ones just churn the memo.
+    """
+    if isinstance(query, Document):
+        return query
+    doc = _documents.get(query)
+    if doc is None:
+        if len(_documents) >= DOCUMENT_MEMO_MAX:
+            _documents.clear()
+        doc = _documents[query] = Document(query)
+    return doc
+
+def _splice_raw(value) -> Optional[bytes]:
+    """
+    JSON bytes for a value holding RawJSON fragments, each written where it sits;
+    None if it holds none (the caller encodes it with the codec as part of its parent).
+    """
+    if isinstance(value, RawJSON):
+        return value.encoded
+    if isinstance(value, dict):
+        # plain members go through the codec in one call, members holding fragments follow them
+        plain, spliced = {}, []
+        for k, v in value.items():
+            raw = _splice_raw(v) if isinstance(v, (RawJSON, dict, list, tuple)) else None
+            if raw is None:
+                plain[k] = v
+            else:
+                spliced.append(codec.dumps(str(k)) + b":" + raw)
+        if not spliced:
+            return None
+        head = codec.dumps(plain)[:-1] + b"," if plain else b"{"
+        return head + b",".join(spliced) + b"}"
+    if isinstance(value, (list, tuple)):
+        items = [_splice_raw(v) if isinstance(v, (RawJSON, dict, list, tuple)) else None for v in value]
+        if all(raw is None for raw in items):
+            return None
+        return b"[" + b",".join(codec.dumps(v) if raw is None else raw for v, raw in zip(value, items)) + b"]"
+    return None
+
+def encode_variables(variables: dict) -> bytes:
+    """Encode variables, splicing RawJSON fragments in as-is."""
+    variables = variables or {}
+    body = _splice_raw(variables)
+    return codec.dumps(variables) if body is None else body
+
+def encode_body(doc: Document, variables: dict) -> bytes:
+    return b'{"query":' + doc.encoded + b',"variables":' + encode_variables(variables) + b"}"
+
+def _gql_request(doc: Document, variables: dict) -> Tuple[dict, bytes]:
+    """POST one GraphQL document. Returns (full_response, raw_response_bytes); raises on HTTP errors only."""
+    import requests  # deferred: ~tens of ms, and only needed once we actually talk to the API
+
+    headers = {"Authorization": api_key(), "Content-Type": "application/json"}
+    r = requests.post(LINEAR_API_URL, headers=headers, data=encode_body(doc, variables))
+    if r.status_code != 200:
+        raise RuntimeError(f"HTTP {r.status_code}: {r.text}")
+    payload = r.content
+    return codec.loads(payload), payload
+
+def _gql_post(doc: Document, variables: dict) -> Tuple[dict, bytes]:
+    """POST one GraphQL document. Returns (data, raw_response_bytes)."""
+    resp, payload = _gql_request(doc, variables)
+    if "errors" in resp and resp["errors"]:
+        raise RuntimeError(json.dumps(resp["errors"]))
+    return resp["data"], payload
+
+def gql(query: Union[str, Document], variables: dict, use_cache: bool = True):
+    """
+    Run a GraphQL document.
+    Queries go through the read-through cache (see below); mutations always hit the API
+    and then invalidate cached queries whose root field they may have changed.
+    """
+    doc = document(query)
+    if doc.op != "query":
+        # mutations, and anything we couldn't classify, are treated as writes
+        try:
+            data, _ = _gql_post(doc, variables)
+        finally:
+            # invalidate even on failure: the server may have applied part of it
+            _query_cache.invalidate(_MUTATION_INVALIDATES.get(doc.root))
+        return data
+    if not use_cache or QUERY_CACHE_TTL_SEC <= 0 or not doc.root:
+        return _gql_post(doc, variables)[0]
+    return _query_cache.get_or_fetch(doc, variables)
+
+def gql_partial(query: Union[str, Document], variables: dict) -> Tuple[dict, list]:
+    """
+    Like gql, but uncached and without raising on GraphQL errors: returns (data, errors).
+    For aliased batches, where each alias succeeds or fails on its own and the failed
+    ones come back null in `data` while the rest have already been applied.
+    """
+    doc = document(query)
+    try:
+        resp, _ = _gql_request(doc, variables)
+    finally:
+        if doc.op != "query":
+            _query_cache.invalidate(_MUTATION_INVALIDATES.get(doc.root))
+    return resp.get("data") or {}, resp.get("errors") or []
+
+# ---------------- Query cache ----------------
+# Read-through cache for queries only: TTL + LRU + byte cap, with singleflight
+# coalescing so concurrent identical queries share one HTTP request.
+
+QUERY_CACHE_TTL_SEC = 120.0
+QUERY_CACHE_MAX_ENTRIES = 512
+QUERY_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# mutation root field -> query root fields it can make stale (None = everything but introspection)
+_MUTATION_INVALIDATES: Dict[str, Tuple[str, ...]] = {
+    "projectCreate": ("projects",),
+    "projectDelete": ("projects", "project", "issues"),
+    "projectArchive": ("projects", "project", "issues"),
+    "projectUpdate": ("projects", "project"),
+    "issueCreate": ("project", "issue", "issues"),
+    "issueUpdate": ("project", "issue", "issues"),
+    "issueLabelCreate": ("issueLabels",),
+    "projectRelationCreate": ("project",),
+    "entityExternalLinkCreate": ("project",),
+    "attachmentCreate": ("issue",),
+}
+_INTROSPECTION_ROOTS = frozenset({"__schema", "__type"})
+
+_DEFINITION_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}()]|[_A-Za-z]\w*')
+_ROOT_FIELD_RE = re.compile(r"\s*(?:\w+\s*:\s*)?(\w+)")
+_OPERATION_KEYWORDS = frozenset({"query", "mutation", "subscription"})
+
+def _operation_and_root(query: str) -> Tuple[str, str]:
+    """
+    Return (operation_type, first_root_field) of the first operation definition in a
+    GraphQL document, skipping fragment definitions, e.g. ('query', 'projects').
+    Either part is "" when it can't be determined; such documents are never cached.
+    """
+    depth = parens = 0
+    keyword = None  # first word of the top-level definition being read
+    for m in _DEFINITION_TOKEN_RE.finditer(query):
+        tok = m.group(0)
+        if tok == "(":
+            parens += 1
+        elif tok == ")":
+            parens -= 1
+        elif parens or tok[0] == '"':
+            continue
+        elif tok == "{":
+            if depth == 0 and keyword != "fragment":
+                if keyword is not None and keyword not in _OPERATION_KEYWORDS:
+                    return "", ""
+                root = _ROOT_FIELD_RE.match(query, m.end())
+                return keyword or "query", root.group(1) if root else ""
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                keyword = None
+        elif depth == 0 and keyword is None:
+            keyword = tok
+    return "", ""
+
+class _InFlight:
+    __slots__ = ("event", "payload", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.payload: Optional[bytes] = None
+        self.error: Optional[BaseException] = None
+
+class QueryCache:
+    """
+    Entries store the raw response bytes and are decoded on every hit, so callers
+    always get a private dict they are free to mutate.
+    """
+
+    def __init__(self, ttl_sec: float, max_entries: int, max_bytes: int):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[float, str, bytes]]" = OrderedDict()  # key -> (expires_at, root, payload)
+        self._bytes = 0
+        self._inflight: Dict[Tuple[str, bytes], _InFlight] = {}
+        self._generation = 0
+        self.hits = self.misses = self.coalesced = 0
+
+    @staticmethod
+    def make_key(doc: Document, variables: dict) -> Tuple[str, bytes]:
+        """Minified document text + canonical (sorted-key) variables."""
+        return doc.text, codec.dumps(variables or {}, sort_keys=True)
+
+    def get_or_fetch(self, doc: Document, variables: dict) -> dict:
+        key = self.make_key(doc, variables)
+        cached: Optional[bytes] = None
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                if hit[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    cached = hit[2]
+                else:
+                    self._drop(key)
+            if cached is None:
+                waiter = self._inflight.get(key)
+                if waiter is not None:
+                    self.coalesced += 1
+                else:
+                    leader = self._inflight[key] = _InFlight()
+                    generation = self._generation
+                    self.misses += 1
+
+        # payloads are immutable bytes, so decoding happens outside the lock
+        if cached is not None:
+            return codec.loads(cached)["data"]
+
+        if waiter is not None:
+            waiter.event.wait()
+            if waiter.error is not None:
+                raise waiter.error
+            return codec.loads(waiter.payload)["data"]
+
+        try:
+            data, payload = _gql_post(doc, variables)
+            leader.payload = payload
+        except BaseException as e:
+            leader.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                # a mutation landed while we were fetching -> result may be stale, don't keep it
+                if leader.payload is not None and generation == self._generation:
+                    self._store(key, doc.root, leader.payload)
+            leader.event.set()
+        return data
+
+    def invalidate(self, roots: Optional[Tuple[str, ...]] = None):
+        """Drop entries for the given root fields; None drops everything except introspection."""
+        with self._lock:
+            self._generation += 1
+            for key, (_, root, _) in list(self._entries.items()):
+                if (root in roots) if roots is not None else (root not in _INTROSPECTION_ROOTS):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def _store(self, key: Tuple[str, bytes], root: str, payload: bytes):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_sec, root, payload)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Tuple[str, bytes]):
+        _, _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+_query_cache = QueryCache(QUERY_CACHE_TTL_SEC, QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_BYTES)
+
+def mutation_exists(name: str) -> bool:
+    q = """query{ __schema{ mutationType{ fields{ name } } } }"""
+    try:
+        data = gql(q, {})
+        return any(f["name"] == name for f in data["__schema"]["mutationType"]["fields"])
+    except Exception:
+        return False
+
+# ---------------- Shared lookups ----------------
+
+_PROJECTS_PAGE = document("""
+    query($first:Int!, $after:String){
+      projects(first:$first, after:$after){
+        nodes{ id name }
+        pageInfo{ hasNextPage endCursor }
+      }
+    }""")
+
+def get_project_id_by_name_exact(name: str) -> Optional[str]:
+    after = None
+    while True:
+        data = gql(_PROJECTS_PAGE, {"first": 100, "after": after})
+        for n in data["projects"]["nodes"]:
+            if n["name"] == name:
+                return n["id"]
+        p = data["projects"]["pageInfo"]
+        if not p["hasNextPage"]:
+            return None
+        after = p["endCursor"]
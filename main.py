@@ -1,12 +1,16 @@
 ## Add estimated issue due date ## 
-import os, sys, json, time, requests, re
+# Provisioning / scheduling for SO projects. Run via `python cli.py provision|plan|reschedule|sync`.
+import sys, json, time, re
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, Dict, List, Tuple, Set
-from dateutil.relativedelta import relativedelta
-from dotenv import load_dotenv, find_dotenv
+from typing import Optional, Dict, List, Tuple, Set, Iterable, Iterator, Union
 
-load_dotenv(find_dotenv())
+from linear_core import (
+    RawJSON, document, get_project_id_by_name_exact, gql, gql_partial, mutation_exists, require_env, team_id,
+)
+from scheduling import BatchPlan, WorkCalendar, plan_batch
+from capacity import LoadTimeline, schedule_sales_orders, so_tasks_from_schedule
+from templates import TemplateBuilder, TemplateIssue
 
 # ---------------- CONFIG ----------------
 
@@ -26,6 +30,19 @@ PHASE_LENGTHS_MONTHS: Dict[str, int] = {
 SO_STAGGER_MONTHS = 2
 BASE_DATE: Optional[datetime] = None
 
+# Capacity-aware stagger: place each SO at the earliest start where no department
+# (assigneeId group in the schedule JSON) exceeds its concurrent open-task limit.
+# Falls back to the fixed SO_STAGGER_MONTHS offset when disabled or on error.
+CAPACITY_AWARE_STAGGER = True
+DEFAULT_DEPARTMENT_CAPACITY = 2
+DEPARTMENT_CAPACITY: Dict[str, int] = {
+    # "design@spikeelectric.com": 1,
+}
+
+# Working-day calendar for due dates / project windows (see scheduling.py)
+WORKWEEK = "Mon Tue Wed Thu Fri"
+HOLIDAYS_FILE = "holidays.txt"   # one YYYY-MM-DD per line, next to this script; optional
+
 LEAD_ID = "70ef7c7b-49da-4cc8-8747-720b8394dbc6"
 
 SOURCE_TEMPLATE_PROJECT_NAMES = {
@@ -46,40 +63,13 @@ SO_RESOURCE_LINKS: Dict[str, str] = {
 #      "SO109610": "https://businesscentral.dynamics.com/78839bf2-9e68-4bb0-9a66-c8cdb4fddbd4/Staging/?company=Spike%20Electric%20Controls&bookmark=21_JAAAAACLAQAAAAJ7_1MATwAxADAAOQA2ADEAMA&page=42&filter=%27Sales%20Header%27.%27Document%20Type%27%20IS%20%271%27"
 # }
 
-LINEAR_API_URL = "https://api.linear.app/graphql"
-LINEAR_API_KEY = os.getenv("LINEAR_API_KEY")
-LINEAR_TEAM_ID = os.getenv("LINEAR_TEAM_ID")
-
 SLEEP_BETWEEN_CALLS_SEC = 0.15
 DRY_RUN = False
 INHERIT_RELATIONS_FROM_TEMPLATES = TRUE = True  # keep compatibility if referenced elsewhere
 
-# ---------------- GraphQL helpers ----------------
-
-def die(msg: str):
-    print(f"[FATAL] {msg}", file=sys.stderr); sys.exit(1)
-
-def gql(query: str, variables: dict):
-    headers = {"Authorization": LINEAR_API_KEY, "Content-Type": "application/json"}
-    r = requests.post(LINEAR_API_URL, headers=headers, data=json.dumps({"query": query, "variables": variables}))
-    if r.status_code != 200:
-        raise RuntimeError(f"HTTP {r.status_code}: {r.text}")
-    data = r.json()
-    if "errors" in data and data["errors"]:
-        raise RuntimeError(json.dumps(data["errors"]))
-    return data["data"]
-
 def iso_date(d: datetime) -> str:
     return d.date().isoformat()
 
-def mutation_exists(name: str) -> bool:
-    q = """query{ __schema{ mutationType{ fields{ name } } } }"""
-    try:
-        data = gql(q, {})
-        return any(f["name"] == name for f in data["__schema"]["mutationType"]["fields"])
-    except Exception:
-        return False
-
 # ---------------- JSON schedule (due dates) ----------------
 
 SCHEDULE_JSON = "spike_linear_issues.json"
@@ -121,6 +111,10 @@ def _load_issue_sequence() -> List[Tuple[str, int]]:
     Loads spike_linear_issues.json from the same folder as this script.
     Returns a list of (cleaned_lower_title, days) sorted by 'order' if present.
     """
+    return [(title, days) for title, days, _ in _load_issue_tasks()]
+
+def _load_issue_tasks() -> List[Tuple[str, int, str]]:
+    """Same as _load_issue_sequence, plus the lower-cased assignee group: [(title, days, group), ...]."""
     p = _script_dir() / SCHEDULE_JSON
     if not p.exists():
         print(f"[WARN] Schedule JSON not found at {p}. Due dates will not be set.")
@@ -133,13 +127,13 @@ def _load_issue_sequence() -> List[Tuple[str, int]]:
     if items and all("order" in x for x in items):
         items = sorted(items, key=lambda x: x["order"])
 
-    seq: List[Tuple[str, int]] = []
+    seq: List[Tuple[str, int, str]] = []
     for it in items:
         raw_title = it.get("issueName") or it.get("title")
         days = _parse_days(it.get("dueDate"))
         title = clean_title_for_lookup(raw_title)
         if title and days is not None:
-            seq.append((title, days))
+            seq.append((title, days, (it.get("assigneeId") or "").strip().lower()))
     print(f"[INFO] Loaded {len(seq)} schedule items from {SCHEDULE_JSON}")
     return seq
 
@@ -155,31 +149,8 @@ def _build_cumulative_days(seq: List[Tuple[str, int]]) -> Dict[str, int]:
         out[title] = total
     return out
 
-def _calc_due_date_iso(base_dt: datetime, cumulative_days: int) -> str:
-    """Return YYYY-MM-DD for base_dt + cumulative_days."""
-    return iso_date(base_dt + relativedelta(days=cumulative_days))
-
 # ---------------- Data fetchers ----------------
 
-def get_project_id_by_name_exact(name: str) -> Optional[str]:
-    after = None
-    while True:
-        q = """
-        query($first:Int!, $after:String){
-          projects(first:$first, after:$after){
-            nodes{ id name }
-            pageInfo{ hasNextPage endCursor }
-          }
-        }"""
-        data = gql(q, {"first": 100, "after": after})
-        for n in data["projects"]["nodes"]:
-            if n["name"] == name:
-                return n["id"]
-        p = data["projects"]["pageInfo"]
-        if not p["hasNextPage"]:
-            return None
-        after = p["endCursor"]
-
 def list_issue_titles_in_project(project_id: str) -> Set[str]:
     titles: Set[str] = set()
     after = None
@@ -224,6 +195,56 @@ def find_issue_id_in_project_by_title(project_id: str, title: str) -> Optional[s
         after = block["pageInfo"]["endCursor"]
     return None
 
+def list_issues_in_project(project_id: str) -> List[Tuple[str, str, Optional[str]]]:
+    """[(issue_id, title, due_date_iso_or_None), ...] for every issue in a project."""
+    out: List[Tuple[str, str, Optional[str]]] = []
+    after = None
+    while True:
+        q = """
+        query($id:String!, $first:Int!, $after:String){
+          project(id:$id){
+            issues(first:$first, after:$after){
+              nodes{ id title dueDate }
+              pageInfo{ hasNextPage endCursor }
+            }
+          }
+        }"""
+        data = gql(q, {"id": project_id, "first": 100, "after": after})
+        block = data["project"]["issues"]
+        for node in block["nodes"]:
+            out.append((node["id"], node["title"], node.get("dueDate")))
+        if not block["pageInfo"]["hasNextPage"]:
+            break
+        after = block["pageInfo"]["endCursor"]
+    return out
+
+def list_open_issues_with_due_dates() -> List[Tuple[str, str, Optional[str], str]]:
+    """[(title, due_date_iso, assignee_email_or_None, project_name), ...] for the team's open issues with a due date."""
+    out: List[Tuple[str, str, Optional[str], str]] = []
+    after = None
+    while True:
+        q = """
+        query($team:ID!, $first:Int!, $after:String){
+          issues(first:$first, after:$after, filter:{
+            team:{ id:{ eq:$team } }
+            dueDate:{ null:false }
+            state:{ type:{ nin:["completed", "canceled"] } }
+          }){
+            nodes{ title dueDate assignee{ email } project{ name } }
+            pageInfo{ hasNextPage endCursor }
+          }
+        }"""
+        data = gql(q, {"team": team_id(), "first": 250, "after": after})
+        block = data["issues"]
+        for n in block["nodes"]:
+            email = (n.get("assignee") or {}).get("email")
+            project = (n.get("project") or {}).get("name") or ""
+            out.append((n["title"], n["dueDate"], email.lower() if email else None, project))
+        if not block["pageInfo"]["hasNextPage"]:
+            break
+        after = block["pageInfo"]["endCursor"]
+    return out
+
 def get_issue_description(issue_id: str) -> str:
     q = """query($id:String!){ issue(id:$id){ description } }"""
     try:
@@ -233,9 +254,12 @@ def get_issue_description(issue_id: str) -> str:
         return ""
 
 # -------- Template issues (title/desc/labels) --------
-def fetch_template_issues_with_labels(project_id: str) -> List[Tuple[str, str, List[str]]]:
-    """Return [(title, description, [label_names...]), ...] from a source project."""
-    items: List[Tuple[str, str, List[str]]] = []
+
+# one builder per run: descriptions and label sets are shared across all template projects
+_template_builder = TemplateBuilder(lookup=clean_title_for_lookup)
+
+def iter_template_issues(project_id: str) -> Iterator[TemplateIssue]:
+    """Stream a source project's issues as compact TemplateIssue records, one page at a time."""
     after = None
     while True:
         q = """
@@ -251,15 +275,17 @@ def fetch_template_issues_with_labels(project_id: str) -> List[Tuple[str, str, L
             }
           }
         }"""
-        data = gql(q, {"id": project_id, "first": 100, "after": after})
+        # template pages are read once per run; skip the query cache so they aren't held twice
+        data = gql(q, {"id": project_id, "first": 100, "after": after}, use_cache=False)
         block = data["project"]["issues"]
-        for node in block["nodes"]:
-            labels = [l["name"] for l in node.get("labels", {}).get("nodes", [])]
-            items.append((node["title"], node.get("description") or "", labels))
+        yield from _template_builder.records(block["nodes"])
         if not block["pageInfo"]["hasNextPage"]:
             break
         after = block["pageInfo"]["endCursor"]
-    return items
+
+def fetch_template_issues_with_labels(project_id: str) -> List[Tuple[str, str, List[str]]]:
+    """Return [(title, description, [label_names...]), ...] from a source project."""
+    return _template_builder.as_tuples(iter_template_issues(project_id))
 
 # ----- Labels -----
 
@@ -301,7 +327,7 @@ def get_or_create_label_id(name: str) -> Optional[str]:
         print(f"       [INFO] couldn't create label '{name}': {e}")
         return None
 
-def map_label_names_to_ids(names: List[str]) -> List[str]:
+def map_label_names_to_ids(names: Iterable[str]) -> List[str]:
     ids = []
     for nm in names:
         lid = get_or_create_label_id(nm)
@@ -327,31 +353,32 @@ def create_project_blank(name: str, description: str, start_date: str, target_da
         "startDate": start_date,
         "targetDate": target_date,
         "leadId": LEAD_ID,
-        "teamIds": [LINEAR_TEAM_ID],
+        "teamIds": [team_id()],
     }
     data = gql(mutation, {"input": inp})
     return data["projectCreate"]["project"]
 
-def create_issue(project_id: str, title: str, description: str, label_ids: List[str], due_date_iso: Optional[str]) -> dict:
-    mutation = """
+_ISSUE_CREATE = document("""
     mutation($input: IssueCreateInput!) {
       issueCreate(input: $input) {
         success
         issue { id title dueDate }
       }
-    }"""
+    }""")
+
+def create_issue(project_id: str, title: str, description: Union[str, RawJSON], label_ids: List[str], due_date_iso: Optional[str]) -> dict:
     inp = {
         "title": title,
         "description": description,
         "projectId": project_id,
-        "teamId": LINEAR_TEAM_ID,
+        "teamId": team_id(),
         "assigneeId": LEAD_ID,
         "priority": 0,
         "labelIds": label_ids or [],
     }
     if due_date_iso:
         inp["dueDate"] = due_date_iso
-    data = gql(mutation, {"input": inp})
+    data = gql(_ISSUE_CREATE, {"input": inp})
     return data["issueCreate"]["issue"]
 
 def update_issue_description(issue_id: str, new_description: str):
@@ -368,6 +395,13 @@ def update_issue_due_date(issue_id: str, due_date_iso: str):
     }"""
     gql(mutation, {"id": issue_id, "input": {"dueDate": due_date_iso}})
 
+def update_project_dates(project_id: str, start_date: str, target_date: str):
+    mutation = """
+    mutation($id:String!, $input: ProjectUpdateInput!){
+      projectUpdate(id:$id, input:$input){ success }
+    }"""
+    gql(mutation, {"id": project_id, "input": {"startDate": start_date, "targetDate": target_date}})
+
 def create_dependency_relation(predecessor_project_id: str, successor_project_id: str):
     mutation = """
     mutation($input: ProjectRelationCreateInput!) {
@@ -485,11 +519,17 @@ def try_attachment_on_issue(issue_id: str, label: str, url: str) -> bool:
         print(f"       [INFO] attachmentCreate failed (ok to ignore): {e}")
         return False
 
-def add_project_resources_link(project_id: str, url: str, label: str = "Dynamics link"):
+_external_link_fields: Optional[Tuple[Optional[str], str, str]] = None
+
+def _resolve_external_link_fields() -> Tuple[Optional[str], str, str]:
     """
-    Adds a Project → Resources link using entityExternalLinkCreate.
-    Falls back to common field names if introspection is unavailable.
+    Introspect EntityExternalLinkCreateInput once per run.
+    Returns (id_field or None, url_field, label_field).
     """
+    global _external_link_fields
+    if _external_link_fields is not None:
+        return _external_link_fields
+
     id_field = None
     label_field = "label"
     url_field = "url"
@@ -514,7 +554,17 @@ def add_project_resources_link(project_id: str, url: str, label: str = "Dynamics
         if "url" not in fields and "link" in fields:
             url_field = "link"
     except Exception:
-        pass
+        return id_field, url_field, label_field  # don't memoize a failed introspection
+
+    _external_link_fields = (id_field, url_field, label_field)
+    return _external_link_fields
+
+def add_project_resources_link(project_id: str, url: str, label: str = "Dynamics link"):
+    """
+    Adds a Project → Resources link using entityExternalLinkCreate.
+    Falls back to common field names if introspection is unavailable.
+    """
+    id_field, url_field, label_field = _resolve_external_link_fields()
 
     candidates = []
     if id_field:
@@ -552,38 +602,223 @@ def add_project_resources_link(project_id: str, url: str, label: str = "Dynamics
 
     print(f"       [INFO] entityExternalLinkCreate failed. Tried field sets: {tried_signatures}. Last error: {last_err}")
 
-# ---------------- MAIN ----------------
+# ----- Resources: batched link stage (all phases of all SOs) -----
 
-def main():
-    if not LINEAR_API_KEY:
-        die("LINEAR_API_KEY not set")
-    if not LINEAR_TEAM_ID:
-        die("LINEAR_TEAM_ID not set")
+RESOURCE_LINK_BATCH_SIZE = 50  # aliased operations per request
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+_PROJECT_LINKS_PAGE = document("""
+query($id: String!, $after: String){
+  project(id: $id){
+    externalLinks(first: 100, after: $after){ nodes{ url } pageInfo{ hasNextPage endCursor } }
+  }
+}""")
+
+def fetch_project_link_urls(project_ids: List[str]) -> Dict[str, Set[str]]:
+    """
+    {project_id: {external_link_url, ...}} for many projects using aliased `project` queries,
+    one request per RESOURCE_LINK_BATCH_SIZE projects; projects with more than one page of
+    links are paged individually. A project whose alias errors (deleted, unknown id, ...)
+    is left out: its links are unknown, not empty.
+    """
+    out: Dict[str, Set[str]] = {}
+    next_page: Dict[str, str] = {}  # project_id -> cursor of its next externalLinks page
+    for chunk in _chunks(list(dict.fromkeys(project_ids)), RESOURCE_LINK_BATCH_SIZE):
+        params = ", ".join(f"$p{i}:String!" for i in range(len(chunk)))
+        body = "\n".join(
+            f"p{i}: project(id:$p{i}){{ id externalLinks(first:100){{ nodes{{ url }} pageInfo{{ hasNextPage endCursor }} }} }}"
+            for i in range(len(chunk))
+        )
+        data, _errors = gql_partial(f"query({params}){{\n{body}\n}}", {f"p{i}": pid for i, pid in enumerate(chunk)})
+        for i, pid in enumerate(chunk):
+            node = data.get(f"p{i}")
+            if node is None:
+                continue
+            conn = node.get("externalLinks") or {}
+            out[pid] = {l["url"] for l in conn.get("nodes", []) if l.get("url")}
+            page = conn.get("pageInfo") or {}
+            if page.get("hasNextPage"):
+                next_page[pid] = page.get("endCursor")
+
+    for pid, after in next_page.items():
+        while after:
+            data, _errors = gql_partial(_PROJECT_LINKS_PAGE, {"id": pid, "after": after})
+            conn = (data.get("project") or {}).get("externalLinks")
+            if conn is None:
+                out.pop(pid, None)  # only part of the list was read
+                break
+            out[pid].update(l["url"] for l in conn.get("nodes", []) if l.get("url"))
+            page = conn.get("pageInfo") or {}
+            after = page.get("endCursor") if page.get("hasNextPage") else None
+    return out
+
+def add_resources_links_batch(links: List[Tuple[str, str]], label: str = "Dynamics link",
+                              dry_run: Optional[bool] = None):
+    """
+    Resource-link stage for a whole run. `links` is [(project_id, url), ...].
+    1) one aliased query finds which projects already carry the url;
+    2) one aliased entityExternalLinkCreate mutation creates only the missing ones.
+    Projects whose links could not be read are skipped rather than risk a duplicate link.
+    Aliases the batched mutation rejects are retried with add_project_resources_link.
+    """
+    links = list(dict.fromkeys(links))
+    if not links:
+        return
 
     try:
-        warm_label_cache()
+        existing = fetch_project_link_urls([pid for pid, _ in links])
     except Exception as e:
-        print(f"[WARN] Could not warm label cache: {e}")
+        print(f"       [INFO] Could not read existing project links: {e}")
+        existing = {}
+
+    unknown = [(pid, url) for pid, url in links if pid not in existing]
+    missing = [(pid, url) for pid, url in links if pid in existing and url not in existing[pid]]
+    print(f"[INFO] Resources links: {len(links) - len(missing) - len(unknown)} present, {len(missing)} to create")
+    if unknown:
+        print(f"[WARN] Resources links: could not read links of {len(unknown)} project(s), skipping: "
+              f"{sorted({pid for pid, _ in unknown})}")
+    if not missing or (DRY_RUN if dry_run is None else dry_run):
+        return
+
+    id_field, url_field, label_field = _resolve_external_link_fields()
+    id_field = id_field or "projectId"
+
+    for chunk in _chunks(missing, RESOURCE_LINK_BATCH_SIZE):
+        params = ", ".join(f"$i{i}: EntityExternalLinkCreateInput!" for i in range(len(chunk)))
+        body = "\n".join(f"l{i}: entityExternalLinkCreate(input:$i{i}){{ success }}" for i in range(len(chunk)))
+        variables = {
+            f"i{i}": {id_field: pid, url_field: url, label_field: label}
+            for i, (pid, url) in enumerate(chunk)
+        }
+        # aliases succeed or fail independently: only the ones that didn't land are retried
+        try:
+            data, errors = gql_partial(f"mutation({params}){{\n{body}\n}}", variables)
+            failed = [link for i, link in enumerate(chunk) if not (data.get(f"l{i}") or {}).get("success")]
+            lost = []
+        except Exception as e:
+            # transport failure: unknown which aliases were applied, so re-read before retrying
+            errors = [str(e)]
+            try:
+                now = fetch_project_link_urls([pid for pid, _ in chunk])
+            except Exception:
+                now = {}
+            failed = [(pid, url) for pid, url in chunk if pid in now and url not in now[pid]]
+            lost = [pid for pid, _ in chunk if pid not in now]
+            if lost:
+                print(f"       [WARN] Link batch failed and {len(lost)} project(s) could not be re-read, not retrying: {lost}")
+        added = len(chunk) - len(failed) - len(lost)
+        if added:
+            print(f"       Resources: added {added} links in one entityExternalLinkCreate batch")
+        if failed:
+            print(f"       [INFO] {len(failed)} batched link(s) failed, retrying one by one: {errors}")
+            for pid, url in failed:
+                add_project_resources_link(pid, url, label=label)
+        time.sleep(SLEEP_BETWEEN_CALLS_SEC)
+
+# ---------------- Capacity-aware stagger ----------------
+
+def capacity_aware_so_bases(sales_orders: List[str], base: datetime, tasks: List[Tuple[str, int, str]],
+                            calendar: WorkCalendar) -> list:
+    """
+    Build per-department load from the team's open issues, then place each SO at the
+    earliest working day where its schedule fits DEPARTMENT_CAPACITY. Returns one base per SO.
+    """
+    groups = {g for _, _, g in tasks if g}
+    days_by_title = {t: d for t, d, _ in tasks}
+    group_by_title = {t: g for t, _, g in tasks}
+
+    # existing issue → group: its assignee if that's a department address, else the schedule's owner for the title
+    # the SOs being (re)planned must not count as load against themselves
+    own_prefixes = tuple(f"{so} " for so in sales_orders)
+    open_load = []
+    for title, due, email, project in list_open_issues_with_due_dates():
+        if project.startswith(own_prefixes):
+            continue
+        key = clean_title_for_lookup(title)
+        group = email if email in groups else group_by_title.get(key)
+        if group:
+            open_load.append((group, due, days_by_title.get(key, 1)))
+    print(f"[INFO] Capacity: {len(open_load)} open issues across {len(groups)} departments")
+
+    timeline = LoadTimeline(calendar, base)
+    timeline.add_open_issues(open_load)
+    return schedule_sales_orders(sales_orders, timeline, so_tasks_from_schedule(tasks),
+                                 DEPARTMENT_CAPACITY, DEFAULT_DEPARTMENT_CAPACITY)
+
+# ---------------- Planning ----------------
 
-    # Load JSON schedule → (cleaned_lower_title, days) → cumulative map
-    seq = _load_issue_sequence()
+def build_plan(sales_orders: List[str], base: Optional[datetime] = None,
+               capacity_aware: Optional[bool] = None) -> BatchPlan:
+    """
+    Every project window and issue due date for the whole batch, on working days.
+    Capacity-aware placement reads open issues from Linear; the fixed stagger is offline.
+    """
+    if capacity_aware is None:
+        capacity_aware = CAPACITY_AWARE_STAGGER
+
+    # Load JSON schedule → (cleaned_lower_title, days, group) → cumulative map
+    tasks = _load_issue_tasks()
+    seq = [(title, days) for title, days, _ in tasks]
     cumulative_map = _build_cumulative_days(seq) if seq else {}
 
-    # Pre-calc cumulative month offsets for phases
-    cumulative_offsets: Dict[str, int] = {}
-    acc = 0
-    for ph in PHASES:
-        cumulative_offsets[ph] = acc
-        acc += PHASE_LENGTHS_MONTHS[ph]
+    base = base or BASE_DATE or datetime.utcnow().replace(tzinfo=timezone.utc)
+
+    calendar = WorkCalendar.from_file(_script_dir() / HOLIDAYS_FILE, weekmask=WORKWEEK)
+    so_bases = None
+    if capacity_aware and tasks:
+        try:
+            so_bases = capacity_aware_so_bases(sales_orders, base, tasks, calendar)
+        except Exception as e:
+            print(f"[WARN] Capacity-aware stagger failed; using fixed +{SO_STAGGER_MONTHS} months: {e}")
+    plan = plan_batch(sales_orders, base, PHASES, PHASE_LENGTHS_MONTHS, cumulative_map, calendar,
+                      stagger_months=SO_STAGGER_MONTHS, so_bases=so_bases)
 
-    base = BASE_DATE or datetime.utcnow().replace(tzinfo=timezone.utc)
     print(f"[INFO] Base date (SO #1): {iso_date(base)}")
-    print(f"[INFO] SO stagger: +{SO_STAGGER_MONTHS} months")
+    print(f"[INFO] Work week: {WORKWEEK}  Holidays: {len(calendar.holidays)}")
+    if so_bases is not None:
+        print(f"[INFO] SO stagger: capacity-aware (default {DEFAULT_DEPARTMENT_CAPACITY} open tasks per department)")
+    else:
+        print(f"[INFO] SO stagger: +{SO_STAGGER_MONTHS} months")
     print(f"[INFO] Phase durations: {PHASE_LENGTHS_MONTHS}")
+    return plan
+
+def show_plan(plan: BatchPlan, show_issues: bool = False):
+    for so in plan.sales_orders:
+        print(f"\n[SO] {so}  Base={plan.base_iso(so)}")
+        for ph in plan.phases:
+            print(f"  {ph:<18} {plan.start_iso(so, ph)} → {plan.target_iso(so, ph)}")
+        if show_issues:
+            for title in plan.titles:
+                print(f"       {plan.due_iso(so, title)}  {title}")
+
+# ---------------- MAIN ----------------
+
+def main(sales_orders: Optional[List[str]] = None, dry_run: Optional[bool] = None,
+         base_date: Optional[datetime] = None, capacity_aware: Optional[bool] = None,
+         create_projects: bool = True) -> int:
+    """
+    Provision SO projects from the templates. Arguments default to the CONFIG constants above.
+    With create_projects=False (`sync`), only SO projects that already exist are brought up to
+    date: missing template issues, due dates, relations and Resources links.
+    """
+    dry_run = DRY_RUN if dry_run is None else dry_run
+    sales_orders = list(sales_orders or SALES_ORDERS)
+    require_env()
+
+    try:
+        warm_label_cache()
+    except Exception as e:
+        print(f"[WARN] Could not warm label cache: {e}")
+
+    plan = build_plan(sales_orders, base_date, capacity_aware)
     print(f"[INFO] Lead UUID: {LEAD_ID}")
+    print(f"[INFO] DRY_RUN = {dry_run}")
 
     # Template issues cache
-    template_issue_cache: Dict[str, List[Tuple[str, str, List[str]]]] = {}
+    template_issue_cache: Dict[str, List[TemplateIssue]] = {}
     for ph, src_name in SOURCE_TEMPLATE_PROJECT_NAMES.items():
         pid = get_project_id_by_name_exact(src_name)
         if not pid:
@@ -591,11 +826,13 @@ def main():
             template_issue_cache[ph] = []
             continue
         try:
-            template_issue_cache[ph] = fetch_template_issues_with_labels(pid)
+            template_issue_cache[ph] = list(iter_template_issues(pid))
             print(f"[INFO] Loaded {len(template_issue_cache[ph])} template issues from '{src_name}'")
         except Exception as e:
             print(f"[WARN] Could not fetch template issues for '{src_name}': {e}")
             template_issue_cache[ph] = []
+    store = _template_builder.store
+    print(f"[INFO] Template descriptions: {len(store)} unique, {store.nbytes()} bytes encoded")
 
     # Template relations; fallback to default chain
     edges: List[Tuple[str, str]] = []
@@ -611,18 +848,16 @@ def main():
     else:
         print(f"[INFO] Inheriting template relations: {edges}")
 
-    for so_idx, so in enumerate(SALES_ORDERS):
-        so_base = base + relativedelta(months=SO_STAGGER_MONTHS * so_idx)
-        print(f"\n[SO] {so}  Base={iso_date(so_base)}")
+    pending_resource_links: List[Tuple[str, str]] = []
+
+    for so in sales_orders:
+        print(f"\n[SO] {so}  Base={plan.base_iso(so)}")
 
         # Create/get projects
         project_ids_by_phase: Dict[str, str] = {}
-        project_start_dates: Dict[str, datetime] = {}
 
         for ph in PHASES:
-            start_dt = so_base + relativedelta(months=cumulative_offsets[ph])
-            target_dt = start_dt + relativedelta(months=PHASE_LENGTHS_MONTHS[ph])
-            start_date, target_date = iso_date(start_dt), iso_date(target_dt)
+            start_date, target_date = plan.start_iso(so, ph), plan.target_iso(so, ph)
 
             name = f"{so} {ph}"
             desc = f"{so} – {ph}"  # <=255
@@ -631,22 +866,19 @@ def main():
             if pid:
                 print(f"  [SKIP] Exists: {name}")
                 project_ids_by_phase[ph] = pid
-                project_start_dates[ph] = start_dt
+            elif not create_projects:
+                print(f"  [MISS] {name}  (not found; sync does not create projects)")
             else:
                 print(f"  [NEW] {name}  Start={start_date}  Target={target_date}")
-                if not DRY_RUN:
+                if not dry_run:
                     try:
                         proj = create_project_blank(name, desc, start_date, target_date)
                         project_ids_by_phase[ph] = proj["id"]
-                        project_start_dates[ph] = start_dt
                         print(f"       Created → {proj['url']}")
                         time.sleep(SLEEP_BETWEEN_CALLS_SEC)
                     except Exception as e:
                         print(f"       [ERROR] Create failed: {e}")
 
-        # Base for issue due dates = start of the FIRST project in the chain (Sales)
-        first_project_base = project_start_dates.get("Sales", so_base)
-
         # Clone issues from templates and set due dates from JSON with cleaned+lowercased title matching
         for ph in PHASES:
             pid = project_ids_by_phase.get(ph)
@@ -663,13 +895,12 @@ def main():
                 print(f"       [WARN] Could not list issues for {so} {ph}: {e}")
                 existing_titles = set()
 
-            for title, desc, label_names in tmpl_issues:
-                lookup_title = clean_title_for_lookup(title)  # lower-cased + trimmed + punctuation/number cleaned
-                cumulative_days = cumulative_map.get(lookup_title)
-                due_date_iso = _calc_due_date_iso(first_project_base, cumulative_days) if cumulative_days is not None else None
+            for tmpl in tmpl_issues:
+                title, lookup_title = tmpl.title, tmpl.lookup_title  # lookup: lower-cased + trimmed + punctuation/number cleaned
+                due_date_iso = plan.due_iso(so, lookup_title)  # Sales start + cumulative working days
 
                 if title in existing_titles:
-                    if due_date_iso and not DRY_RUN:
+                    if due_date_iso and not dry_run:
                         try:
                             iid = find_issue_id_in_project_by_title(pid, title)
                             if iid:
@@ -682,8 +913,13 @@ def main():
                         print(f"       [SKIP] Issue exists: {title} (no due date mapping for '{lookup_title}')")
                     continue
 
-                label_ids = map_label_names_to_ids(label_names)
+                if dry_run:
+                    print(f"       [WOULD CREATE] Issue: {title}  dueDate={due_date_iso}")
+                    continue
+
+                label_ids = map_label_names_to_ids(tmpl.labels)
                 try:
+                    desc = RawJSON(_template_builder.store.encoded(tmpl.desc_key))  # encoded once per run
                     created = create_issue(pid, title, desc, label_ids, due_date_iso)
                     if due_date_iso:
                         print(f"       Issue created: {title}  dueDate={due_date_iso}")
@@ -696,23 +932,73 @@ def main():
         # Add dependency edges
         for a, b in edges:
             a_id, b_id = project_ids_by_phase.get(a), project_ids_by_phase.get(b)
-            if a_id and b_id and not DRY_RUN:
+            if a_id and b_id and not dry_run:
                 create_dependency_relation(a_id, b_id)
 
-        # Add Dynamics link to each project
+        # Queue Dynamics link for each project; created in one batch after all SOs
         bc_url = SO_RESOURCE_LINKS.get(so)
         if bc_url:
             for ph in PHASES:
                 pid = project_ids_by_phase.get(ph)
-                if not pid:
+                if pid:
+                    pending_resource_links.append((pid, bc_url))
+
+    if pending_resource_links:
+        print("\n[RESOURCES]")
+        add_resources_links_batch(pending_resource_links, label="Dynamics link", dry_run=dry_run)
+
+    print("\n[DONE]")
+    return 0
+
+def reschedule(sales_orders: Optional[List[str]] = None, dry_run: Optional[bool] = None,
+               base_date: Optional[datetime] = None, capacity_aware: Optional[bool] = None) -> int:
+    """Re-plan existing SO projects: move project start/target and issue due dates to the new plan."""
+    dry_run = DRY_RUN if dry_run is None else dry_run
+    sales_orders = list(sales_orders or SALES_ORDERS)
+    require_env()
+
+    plan = build_plan(sales_orders, base_date, capacity_aware)
+    print(f"[INFO] DRY_RUN = {dry_run}")
+
+    for so in sales_orders:
+        print(f"\n[SO] {so}  Base={plan.base_iso(so)}")
+        for ph in PHASES:
+            name = f"{so} {ph}"
+            pid = get_project_id_by_name_exact(name)
+            if not pid:
+                print(f"  [MISS] {name}  (not found)")
+                continue
+
+            start_date, target_date = plan.start_iso(so, ph), plan.target_iso(so, ph)
+            print(f"  [PROJECT] {name}  Start={start_date}  Target={target_date}")
+            if not dry_run:
+                try:
+                    update_project_dates(pid, start_date, target_date)
+                    time.sleep(SLEEP_BETWEEN_CALLS_SEC)
+                except Exception as e:
+                    print(f"       [WARN] Could not update project dates: {e}")
+
+            try:
+                issues = list_issues_in_project(pid)
+            except Exception as e:
+                print(f"       [WARN] Could not list issues for {name}: {e}")
+                continue
+            for iid, title, current_due in issues:
+                due_date_iso = plan.due_iso(so, clean_title_for_lookup(title))
+                if not due_date_iso or due_date_iso == current_due:
                     continue
-                if not DRY_RUN:
-                    add_project_resources_link(pid, bc_url, label="Dynamics link")
+                print(f"       [UPDATE] {title}: {current_due} → {due_date_iso}")
+                if dry_run:
+                    continue
+                try:
+                    update_issue_due_date(iid, due_date_iso)
+                    time.sleep(SLEEP_BETWEEN_CALLS_SEC)
+                except Exception as e:
+                    print(f"       [WARN] Could not update due date for '{title}': {e}")
 
     print("\n[DONE]")
     return 0
 
 if __name__ == "__main__":
-    if not LINEAR_API_KEY or not LINEAR_TEAM_ID:
-        die("Missing env vars. Set LINEAR_API_KEY and LINEAR_TEAM_ID.")
-    sys.exit(main())
+    from cli import main as cli_main
+    sys.exit(cli_main(["provision", *sys.argv[1:]]))
@@ -0,0 +1,172 @@
+"""
+Working-day scheduling for SO batches.
+
+All dates for a batch (project start/target per phase, issue due dates per
+template title) are computed in one vectorized pass with NumPy business-day
+arithmetic, so re-planning hundreds of SOs is a handful of array ops.
+"""
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+DEFAULT_WEEKMASK = "Mon Tue Wed Thu Fri"
+
+DateLike = Union[date, datetime, str, np.datetime64]
+
+def to_day(d: DateLike) -> np.datetime64:
+    if isinstance(d, datetime):
+        d = d.date()
+    return np.datetime64(d, "D")
+
+# ---------------- Calendar ----------------
+
+class WorkCalendar:
+    """Working days = weekmask minus holidays. Thin wrapper over np.busdaycalendar."""
+
+    def __init__(self, weekmask: str = DEFAULT_WEEKMASK, holidays: Iterable[DateLike] = ()):
+        self.weekmask = weekmask
+        self.holidays = sorted({to_day(h) for h in holidays})
+        self._cal = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], weekmask: str = DEFAULT_WEEKMASK) -> "WorkCalendar":
+        """
+        Holiday file: one YYYY-MM-DD per line, optionally followed by a label
+        ("2026-12-25 Christmas"); '#' starts a comment, blank lines ignored.
+        A missing file yields a weekends-only calendar.
+        """
+        p = Path(path)
+        if not p.exists():
+            print(f"[INFO] Holiday file not found at {p}; using weekends only.")
+            return cls(weekmask)
+        holidays: List[np.datetime64] = []
+        with open(p, "r") as f:
+            for lineno, raw in enumerate(f, 1):
+                line = raw.split("#", 1)[0].strip()
+                if not line:
+                    continue
+                token = line.split(None, 1)[0]
+                try:
+                    holidays.append(np.datetime64(token, "D"))
+                except ValueError:
+                    raise ValueError(f"{p}:{lineno}: expected YYYY-MM-DD at start of line, got {raw.strip()!r}") from None
+        print(f"[INFO] Loaded {len(holidays)} holidays from {p.name}")
+        return cls(weekmask, holidays)
+
+    def is_workday(self, dates) -> np.ndarray:
+        return np.is_busday(np.asarray(dates, dtype="datetime64[D]"), busdaycal=self._cal)
+
+    def roll_forward(self, dates) -> np.ndarray:
+        """Move non-working days to the next working day."""
+        return np.busday_offset(np.asarray(dates, dtype="datetime64[D]"), 0, roll="forward", busdaycal=self._cal)
+
+    def roll_backward(self, dates) -> np.ndarray:
+        """Move non-working days to the previous working day."""
+        return np.busday_offset(np.asarray(dates, dtype="datetime64[D]"), 0, roll="backward", busdaycal=self._cal)
+
+    def add_workdays(self, dates, days) -> np.ndarray:
+        """dates (rolled forward onto a working day) + `days` working days. Broadcasts."""
+        return np.busday_offset(
+            np.asarray(dates, dtype="datetime64[D]"), np.asarray(days, dtype=np.int64),
+            roll="forward", busdaycal=self._cal,
+        )
+
+    def count_workdays(self, start, end) -> np.ndarray:
+        """Working days in [start, end). Broadcasts."""
+        return np.busday_count(
+            np.asarray(start, dtype="datetime64[D]"), np.asarray(end, dtype="datetime64[D]"), busdaycal=self._cal,
+        )
+
+def add_months(dates, months) -> np.ndarray:
+    """
+    Vectorized `date + relativedelta(months=n)`: same day-of-month, clamped to the
+    last day of the target month (Jan 31 + 1 month -> Feb 28/29).
+    """
+    d = np.asarray(dates, dtype="datetime64[D]")
+    m = d.astype("datetime64[M]")
+    dom = (d - m.astype("datetime64[D]")).astype(np.int64)
+    target = m + np.asarray(months, dtype=np.int64)
+    days_in_month = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(dom, days_in_month - 1)
+
+# ---------------- Batch plan ----------------
+
+class BatchPlan:
+    """
+    Dates for a batch of SOs, as datetime64[D] arrays:
+      project_start / project_target : (n_so, n_phase)
+      due                            : (n_so, n_title)  — issue due dates
+    """
+
+    def __init__(self, sales_orders: Sequence[str], phases: Sequence[str], titles: Sequence[str],
+                 so_base: np.ndarray, project_start: np.ndarray, project_target: np.ndarray, due: np.ndarray):
+        self.sales_orders = list(sales_orders)
+        self.phases = list(phases)
+        self.titles = list(titles)
+        self.so_base = so_base
+        self.project_start = project_start
+        self.project_target = project_target
+        self.due = due
+        self._so_idx = {so: i for i, so in enumerate(self.sales_orders)}
+        self._phase_idx = {ph: i for i, ph in enumerate(self.phases)}
+        self._title_idx = {t: i for i, t in enumerate(self.titles)}
+        # strings materialized once for the whole batch
+        self._start_iso = np.datetime_as_string(project_start, unit="D")
+        self._target_iso = np.datetime_as_string(project_target, unit="D")
+        self._due_iso = np.datetime_as_string(due, unit="D")
+
+    def base_iso(self, so: str) -> str:
+        return str(np.datetime_as_string(self.so_base[self._so_idx[so]], unit="D"))
+
+    def start_iso(self, so: str, phase: str) -> str:
+        return str(self._start_iso[self._so_idx[so], self._phase_idx[phase]])
+
+    def target_iso(self, so: str, phase: str) -> str:
+        return str(self._target_iso[self._so_idx[so], self._phase_idx[phase]])
+
+    def due_iso(self, so: str, lookup_title: str) -> Optional[str]:
+        """Due date for a cleaned/lower-cased title, or None if the schedule has no entry for it."""
+        j = self._title_idx.get(lookup_title)
+        if j is None:
+            return None
+        return str(self._due_iso[self._so_idx[so], j])
+
+def plan_batch(
+    sales_orders: Sequence[str],
+    base: DateLike,
+    phases: Sequence[str],
+    phase_lengths_months: Dict[str, int],
+    cumulative_days: Dict[str, int],
+    calendar: WorkCalendar,
+    stagger_months: int = 0,
+    so_bases: Optional[Sequence[DateLike]] = None,
+) -> BatchPlan:
+    """
+    Plan every SO in one pass.
+
+    - SO i starts at `so_bases[i]` if given, else `base + stagger_months * i` months.
+    - Phase windows keep their month lengths; starts roll forward and targets roll
+      backward onto working days, so a phase never ends after the next one starts.
+    - Issue due dates = Sales start + cumulative *working* days from the schedule JSON.
+    """
+    n = len(sales_orders)
+    if so_bases is not None:
+        so_base = np.array([to_day(d) for d in so_bases], dtype="datetime64[D]")
+    else:
+        so_base = add_months(np.full(n, to_day(base)), np.arange(n) * stagger_months)
+
+    lengths = np.array([phase_lengths_months[ph] for ph in phases], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    raw_start = add_months(so_base[:, None], offsets[None, :])
+    raw_target = add_months(raw_start, lengths[None, :])
+    project_start = calendar.roll_forward(raw_start)
+    project_target = np.maximum(calendar.roll_backward(raw_target), project_start)
+
+    titles = list(cumulative_days.keys())
+    days = np.fromiter(cumulative_days.values(), dtype=np.int64, count=len(titles))
+    due = calendar.add_workdays(project_start[:, :1], days[None, :]) if titles else np.empty((n, 0), "datetime64[D]")
+
+    return BatchPlan(sales_orders, phases, titles, so_base, project_start, project_target, due)
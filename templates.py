@@ -0,0 +1,86 @@
+"""
+Compact in-memory model of template issues.
+
+A template issue is a __slots__ record holding its title, interned label names and a
+content hash; the description lives once in a DescriptionStore, already JSON-encoded,
+so every issueCreate for every SO reuses the same bytes.
+"""
+import hashlib
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import linear_core
+
+class DescriptionStore:
+    """Content-addressed descriptions: key = blake2b(text) → json-encoded text, stored once."""
+
+    __slots__ = ("_encoded",)
+
+    def __init__(self):
+        self._encoded: Dict[str, bytes] = {}
+
+    def add(self, text: str) -> str:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        if key not in self._encoded:
+            self._encoded[key] = linear_core.codec.dumps(text)
+        return key
+
+    def text(self, key: str) -> str:
+        """Decoded on demand; only the legacy tuple view needs it."""
+        return linear_core.codec.loads(self._encoded[key])
+
+    def encoded(self, key: str) -> bytes:
+        """The description as a JSON string literal, encoded once at load time."""
+        return self._encoded[key]
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def nbytes(self) -> int:
+        return sum(len(b) for b in self._encoded.values())
+
+class TemplateIssue:
+    __slots__ = ("title", "lookup_title", "desc_key", "labels")
+
+    def __init__(self, title: str, lookup_title: str, desc_key: str, labels: Tuple[str, ...]):
+        self.title = title
+        self.lookup_title = lookup_title
+        self.desc_key = desc_key
+        self.labels = labels
+
+    def __repr__(self) -> str:
+        return f"TemplateIssue({self.title!r}, labels={self.labels!r})"
+
+class TemplateBuilder:
+    """
+    Turns raw GraphQL issue nodes into TemplateIssue records.
+    Shared across all template projects so identical descriptions and label sets
+    are stored once for the whole run.
+    """
+
+    def __init__(self, store: Optional[DescriptionStore] = None, lookup=None):
+        self.store = store if store is not None else DescriptionStore()
+        self._lookup = lookup or (lambda s: s)
+        self._label_sets: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def _labels(self, names: Iterable[str]) -> Tuple[str, ...]:
+        t = tuple(sys.intern(n) for n in names)
+        return self._label_sets.setdefault(t, t)
+
+    def record(self, node: dict) -> TemplateIssue:
+        title = node["title"]
+        labels = [l["name"] for l in (node.get("labels") or {}).get("nodes", [])]
+        return TemplateIssue(
+            title,
+            self._lookup(title),
+            self.store.add(node.get("description") or ""),
+            self._labels(labels),
+        )
+
+    def records(self, nodes: Iterable[dict]) -> Iterator[TemplateIssue]:
+        for node in nodes:
+            yield self.record(node)
+
+    def as_tuples(self, issues: Iterable[TemplateIssue]) -> List[Tuple[str, str, List[str]]]:
+        """Legacy [(title, description, [label_names...]), ...] view."""
+        return [(t.title, self.store.text(t.desc_key), list(t.labels)) for t in issues]